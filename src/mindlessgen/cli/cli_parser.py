@@ -86,6 +86,12 @@ def cli_parser(argv: Sequence[str] | None = None) -> dict:
         required=False,
         help="Do not write the molecules to xyz files.",
     )
+    parser.add_argument(
+        "--pool-chunksize",
+        type=int,
+        required=False,
+        help="Number of cycles that are sent to a parallel process at once.",
+    )
     parser.add_argument(
         "--scale-fragment-detection",
         type=float,
@@ -261,6 +267,7 @@ def cli_parser(argv: Sequence[str] | None = None) -> dict:
         "num_molecules": args_dict["num_molecules"],
         "postprocess": args_dict["postprocess"],
         "write_xyz": args_dict["write_xyz"],
+        "pool_chunksize": args_dict["pool_chunksize"],
     }
     # Refinement arguments
     rev_args_dict["refine"] = {
@@ -4,19 +4,57 @@ Main driver of MindlessGen.
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from typing import TYPE_CHECKING
+from ctypes import c_byte
+from functools import lru_cache
 from pathlib import Path
 import multiprocessing as mp
+from multiprocessing.pool import Pool
+import os
+import sys
 import warnings
 
+import numpy as np
+
 from ..molecules import generate_random_molecule, Molecule
-from ..qm import XTB, get_xtb_path, QMMethod, ORCA, get_orca_path, GP3, get_gp3_path
 from ..molecules import iterative_optimization, postprocess_mol
-from ..prog import ConfigManager
+from ..prog import ConfigManager, available_cpu_count
 
 from .. import __version__
 
+if TYPE_CHECKING:
+    from ..qm.base import QMMethod
+
 MINDLESS_MOLECULES_FILE = "mindless.molecules"
+CYCLE_MARKER = "✔"
+
+_HEADER_TEMPLATE = """\
+╔══════════════════════════════════════════════════════════════════════════════════════════════════╗
+║                                                                                                  ║
+║   ███╗   ███╗██╗███╗   ██╗██████╗ ██╗     ███████╗███████╗███████╗ ██████╗ ███████╗███╗   ██╗    ║
+║   ████╗ ████║██║████╗  ██║██╔══██╗██║     ██╔════╝██╔════╝██╔════╝██╔════╝ ██╔════╝████╗  ██║    ║
+║   ██╔████╔██║██║██╔██╗ ██║██║  ██║██║     █████╗  ███████╗███████╗██║  ███╗█████╗  ██╔██╗ ██║    ║
+║   ██║╚██╔╝██║██║██║╚██╗██║██║  ██║██║     ██╔══╝  ╚════██║╚════██║██║   ██║██╔══╝  ██║╚██╗██║    ║
+║   ██║ ╚═╝ ██║██║██║ ╚████║██████╔╝███████╗███████╗███████║███████║╚██████╔╝███████╗██║ ╚████║    ║
+║   ╚═╝     ╚═╝╚═╝╚═╝  ╚═══╝╚═════╝ ╚══════╝╚══════╝╚══════╝╚══════╝ ╚═════╝ ╚══════╝╚═╝  ╚═══╝    ║
+║                                                                                                  ║
+║                                       MindlessGen v{version}                                         ║
+║                                 Semi-Automated Molecule Generator                                ║
+║                                                                                                  ║
+║                          Licensed under the Apache License, Version 2.0                          ║
+║                           (http://www.apache.org/licenses/LICENSE-2.0)                           ║
+╚══════════════════════════════════════════════════════════════════════════════════════════════════╝"""
+
+# State of the worker processes that is constant for the whole run. It is
+# sent only once to each worker by `_init_worker` instead of with every task.
+_CONFIG: ConfigManager
+_REFINE_ENGINE: QMMethod
+_POSTPROCESS_ENGINE: QMMethod | None
+# Stop flag of the worker processes, replaced by the flag shared
+# with the whole pool in `_init_worker`
+_STOP_FLAG = c_byte(0)
 
 
 def generator(config: ConfigManager) -> tuple[list[Molecule] | None, int]:
@@ -41,16 +79,11 @@ def generator(config: ConfigManager) -> tuple[list[Molecule] | None, int]:
         return None, 0
     print(config.generate.soot)
     # Import and set up required engines
-    refine_engine: QMMethod = setup_engines(
-        config.refine.engine,
-        config,
-        get_xtb_path,
-        get_orca_path,  # GP3 cannot be used anyway
-    )
+    refine_engine: QMMethod = setup_engines(config.refine.engine, config)
 
     if config.general.postprocess:
         postprocess_engine: QMMethod | None = setup_engines(
-            config.postprocess.engine, config, get_xtb_path, get_orca_path, get_gp3_path
+            config.postprocess.engine, config
         )
     else:
         postprocess_engine = None
@@ -60,7 +93,8 @@ def generator(config: ConfigManager) -> tuple[list[Molecule] | None, int]:
 
     config.check_config(verbosity=config.general.verbosity)
 
-    num_cores = min(mp.cpu_count(), config.general.parallel)
+    cpu_count = available_cpu_count()
+    num_cores = min(cpu_count, config.general.parallel)
     if config.general.verbosity > 0:
         print(f"Running with {num_cores} cores.")
 
@@ -70,69 +104,274 @@ def generator(config: ConfigManager) -> tuple[list[Molecule] | None, int]:
             print(f"\n--- Appending to existing file '{MINDLESS_MOLECULES_FILE}'. ---")
     exitcode = 0
     optimized_molecules: list[Molecule] = []
-    for molcount in range(config.general.num_molecules):
-        # print a decent header for each molecule iteration
-        if config.general.verbosity > 0:
-            print(f"\n{'='*80}")
-            print(
-                f"{'='*22} Generating molecule {molcount + 1:<4} of "
-                + f"{config.general.num_molecules:<4} {'='*24}"
+    # If there are at least as many molecules as cores, the molecules are generated
+    # in parallel with serial cycles each. Otherwise, the cycles of one molecule are
+    # distributed over the cores.
+    parallelize_outer = num_cores > 1 and config.general.num_molecules >= num_cores
+    with ExitStack() as stack:
+        # Results are pairs of the molecule index and the outcome of its generation
+        results: Iterable[tuple[int, tuple[Molecule | None, int]]]
+        if num_cores == 1:
+            # Without parallelism, the cycles run directly in the main process.
+            # This avoids the start-up and communication cost of a pool.
+            results = (
+                (
+                    molcount,
+                    _generate_molecule_in_process(
+                        molcount, config, refine_engine, postprocess_engine
+                    ),
+                )
+                for molcount in range(config.general.num_molecules)
             )
-            print(f"{'='*80}")
-        manager = mp.Manager()
-        stop_event = manager.Event()
-        cycles = range(config.general.max_cycles)
-        backup_verbosity: int | None = None
-        if num_cores > 1 and config.general.verbosity > 0:
-            backup_verbosity = (
-                config.general.verbosity
-            )  # Save verbosity level for later
-            config.general.verbosity = 0  # Disable verbosity if parallel
-
-        if config.general.verbosity == 0:
-            print("Cycle... ", end="", flush=True)
-        with mp.Pool(processes=num_cores) as pool:
-            results = pool.starmap(
-                single_molecule_generator,
-                [
-                    (config, refine_engine, postprocess_engine, cycle, stop_event)
-                    for cycle in cycles
-                ],
+        else:
+            # The pool and the stop flag are created only once and reused for all
+            # molecules to avoid paying the process start-up cost for every molecule.
+            # 'forkserver' imports the program only once in the server process and
+            # forks the workers from there, which is much cheaper than 'spawn' and,
+            # in contrast to 'fork', safe for multi-threaded parents. It is not
+            # available on Windows.
+            ctx = mp.get_context("forkserver" if sys.platform != "win32" else "spawn")
+            # A lock-free shared byte is sufficient as a "molecule found" flag. A race
+            # between two workers only results in one superfluous cycle.
+            stop_flag = ctx.Value("b", 0, lock=False)
+            # Distribute the available cores among the workers to avoid that each
+            # QM engine started by a worker spawns threads on all cores. Thread
+            # limits set in the environment by the user are not overridden.
+            num_threads = max(1, cpu_count // num_cores)
+            # Verbosity is disabled in parallel workers. The progress markers of the
+            # cycles are returned to and printed by the main process.
+            worker_verbosity = (
+                -1 if parallelize_outer else min(config.general.verbosity, 0)
             )
-        if config.general.verbosity == 0:
+            pool = stack.enter_context(
+                ctx.Pool(
+                    processes=num_cores,
+                    initializer=_init_worker,
+                    initargs=(
+                        config,
+                        refine_engine,
+                        postprocess_engine,
+                        worker_verbosity,
+                        stop_flag,
+                        num_threads,
+                    ),
+                )
+            )
+        if parallelize_outer:
+            if config.general.verbosity > 0:
+                print(
+                    f"\nGenerating {config.general.num_molecules} molecules "
+                    + f"in {num_cores} parallel processes."
+                )
+            elif config.general.verbosity == 0:
+                print("Cycle... ", end="", flush=True)
+            results = pool.imap_unordered(
+                _molecule_worker, range(config.general.num_molecules)
+            )
+        elif num_cores > 1:
+            results = (
+                (
+                    molcount,
+                    _generate_molecule(
+                        pool, stop_flag, num_cores, molcount, config, worker_verbosity
+                    ),
+                )
+                for molcount in range(config.general.num_molecules)
+            )
+
+        for molcount, (optimized_molecule, cycles_needed) in results:
+            # Molecules generated in parallel finish in arbitrary order,
+            # so their header is only printed once they are done
+            if parallelize_outer:
+                _print_molecule_header(molcount, config)
+                if config.general.verbosity == 0:
+                    print(CYCLE_MARKER * cycles_needed, end="", flush=True)
+            if optimized_molecule is None:
+                warnings.warn(
+                    "Molecule generation including optimization (and postprocessing) "
+                    + f"failed for all cycles for molecule {molcount + 1}."
+                )
+                exitcode = 1
+                continue
+            if config.general.verbosity > 0:
+                print(f"Optimized mindless molecule found in {cycles_needed} cycles.")
+                print(optimized_molecule)
+            if config.general.write_xyz:
+                optimized_molecule.write_xyz_to_file()
+                if config.general.verbosity > 0:
+                    print(
+                        f"Written molecule file 'mlm_{optimized_molecule.name}.xyz'.\n"
+                    )
+                with open("mindless.molecules", "a", encoding="utf8") as f:
+                    f.write(f"mlm_{optimized_molecule.name}\n")
+            optimized_molecules.append(optimized_molecule)
+        if parallelize_outer and config.general.verbosity == 0:
             print("")
 
-        # Restore verbosity level if it was changed
-        if backup_verbosity is not None:
-            config.general.verbosity = backup_verbosity
+    return optimized_molecules, exitcode
 
-        # Filter out None values and return the first successful molecule
-        optimized_molecule: Molecule | None = None
-        for i, result in enumerate(results):
-            if result is not None:
-                cycles_needed = i + 1
-                optimized_molecule = result
-                break
 
-        if optimized_molecule is None:
-            warnings.warn(
-                "Molecule generation including optimization (and postprocessing) "
-                + f"failed for all cycles for molecule {molcount + 1}."
+def _generate_molecule(
+    pool: Pool,
+    stop_flag: c_byte,
+    num_cores: int,
+    molcount: int,
+    config: ConfigManager,
+    worker_verbosity: int,
+) -> tuple[Molecule | None, int]:
+    """
+    Generate one molecule by distributing its cycles over the worker processes.
+    """
+    _print_molecule_header(molcount, config)
+    stop_flag.value = 0
+    if worker_verbosity == 0:
+        print("Cycle... ", end="", flush=True)
+    # The cycles are submitted in batches that keep all workers busy once.
+    # The next batch is only submitted if no molecule was found so far,
+    # which limits the wasted work after a success to the current batch.
+    # Within a batch, results are streamed back in the order of completion
+    # and the remaining cycles return immediately once the stop flag is set.
+    optimized_molecule: Molecule | None = None
+    cycles_needed = config.general.max_cycles
+    batch_size = num_cores * config.general.pool_chunksize
+    for batch_start in range(0, config.general.max_cycles, batch_size):
+        batch = range(
+            batch_start,
+            min(batch_start + batch_size, config.general.max_cycles),
+        )
+        markers: list[str] = []
+        for i, (marker, result) in enumerate(
+            pool.imap_unordered(
+                _cycle_worker,
+                batch,
+                chunksize=config.general.pool_chunksize,
             )
-            exitcode = 1
-            continue
-        if config.general.verbosity > 0:
-            print(f"Optimized mindless molecule found in {cycles_needed} cycles.")
-            print(optimized_molecule)
-        if config.general.write_xyz:
-            optimized_molecule.write_xyz_to_file()
-            if config.general.verbosity > 0:
-                print(f"Written molecule file 'mlm_{optimized_molecule.name}.xyz'.\n")
-            with open("mindless.molecules", "a", encoding="utf8") as f:
-                f.write(f"mlm_{optimized_molecule.name}\n")
-        optimized_molecules.append(optimized_molecule)
+        ):
+            markers.append(marker)
+            if result is not None and optimized_molecule is None:
+                cycles_needed = batch_start + i + 1
+                optimized_molecule = result
+                stop_flag.value = 1
+        # Print the markers of the whole batch at once instead of in every worker
+        if worker_verbosity == 0:
+            print("".join(markers), end="", flush=True)
+        # Stop if a molecule was found or a worker aborted the generation,
+        # e.g., in debug mode
+        if optimized_molecule is not None or stop_flag.value:
+            break
+    if worker_verbosity == 0:
+        print("")
+
+    return optimized_molecule, cycles_needed
+
+
+def _generate_molecule_in_process(
+    molcount: int,
+    config: ConfigManager,
+    refine_engine: QMMethod,
+    postprocess_engine: QMMethod | None,
+) -> tuple[Molecule | None, int]:
+    """
+    Generate one molecule with serial cycles in the main process.
+    """
+    _print_molecule_header(molcount, config)
+    if config.general.verbosity == 0:
+        print("Cycle... ", end="", flush=True)
+    result = _generate_molecule_serial(config, refine_engine, postprocess_engine)
+    if config.general.verbosity == 0:
+        print("")
+    return result
+
+
+def _print_molecule_header(molcount: int, config: ConfigManager) -> None:
+    """
+    Print a decent header for each molecule iteration.
+    """
+    if config.general.verbosity > 0:
+        print(f"\n{'='*80}")
+        print(
+            f"{'='*22} Generating molecule {molcount + 1:<4} of "
+            + f"{config.general.num_molecules:<4} {'='*24}"
+        )
+        print(f"{'='*80}")
+
+
+def _generate_molecule_serial(
+    config: ConfigManager,
+    refine_engine: QMMethod,
+    postprocess_engine: QMMethod | None,
+) -> tuple[Molecule | None, int]:
+    """
+    Generate one molecule by running its cycles one after another
+    in the current process.
+    """
+    # The stop flag is local as the cycles are not shared with other processes
+    stop_flag = c_byte(0)
+    for cycle in range(config.general.max_cycles):
+        if config.general.verbosity == 0:
+            # print the cycle in one line, not starting a new line
+            print(CYCLE_MARKER, end="", flush=True)
+        optimized_molecule = single_molecule_generator(
+            config, refine_engine, postprocess_engine, cycle, stop_flag
+        )
+        if optimized_molecule is not None:
+            return optimized_molecule, cycle + 1
+        if stop_flag.value:
+            # Generation was aborted, e.g., in debug mode
+            return None, cycle + 1
+    return None, config.general.max_cycles
+
+
+def _init_worker(
+    config: ConfigManager,
+    refine_engine: QMMethod,
+    postprocess_engine: QMMethod | None,
+    verbosity: int,
+    stop_flag: c_byte,
+    num_threads: int,
+) -> None:
+    """
+    Initialize a worker process of the pool with the constant state of the run
+    and the shared stop flag, and limit the number of threads of the QM engines
+    called from it. Thread limits already set by the user are kept.
+    """
+    global _CONFIG, _REFINE_ENGINE, _POSTPROCESS_ENGINE, _STOP_FLAG
+    _CONFIG = config
+    _CONFIG.general.verbosity = verbosity
+    _REFINE_ENGINE = refine_engine
+    _POSTPROCESS_ENGINE = postprocess_engine
+    _STOP_FLAG = stop_flag
+    # Seed the random number generator once per worker from fresh OS entropy,
+    # so that the workers do not share the random state of the parent process
+    np.random.seed()
+    # Thread settings of the user (e.g., on HPC systems) take precedence
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(var, str(num_threads))
 
-    return optimized_molecules, exitcode
+
+def _cycle_worker(cycle: int) -> tuple[str, Molecule | None]:
+    """
+    Run a single generation cycle in a worker process of the pool.
+    Returns the progress marker of the cycle (empty if it was skipped
+    or verbosity is not 0) together with the result.
+    """
+    if _STOP_FLAG.value:
+        return "", None  # Exit early if a molecule has already been found
+    marker = CYCLE_MARKER if _CONFIG.general.verbosity == 0 else ""
+    return marker, single_molecule_generator(
+        _CONFIG, _REFINE_ENGINE, _POSTPROCESS_ENGINE, cycle, _STOP_FLAG
+    )
+
+
+def _molecule_worker(molcount: int) -> tuple[int, tuple[Molecule | None, int]]:
+    """
+    Generate a whole molecule with serial cycles in a worker process of the pool.
+    Returns the index of the molecule together with the result, as the molecules
+    are collected in the order of completion.
+    """
+    return molcount, _generate_molecule_serial(
+        _CONFIG, _REFINE_ENGINE, _POSTPROCESS_ENGINE
+    )
 
 
 def single_molecule_generator(
@@ -140,18 +379,15 @@ def single_molecule_generator(
     refine_engine: QMMethod,
     postprocess_engine: QMMethod | None,
     cycle: int,
-    stop_event,
+    stop_flag: c_byte,
 ) -> Molecule | None:
     """
     Generate a single molecule.
     """
-    if stop_event.is_set():
+    if stop_flag.value:
         return None  # Exit early if a molecule has already been found
 
-    if config.general.verbosity == 0:
-        # print the cycle in one line, not starting a new line
-        print("✔", end="", flush=True)
-    elif config.general.verbosity > 0:
+    if config.general.verbosity > 0:
         print(f"Cycle {cycle + 1}:")
     #   _____                           _
     #  / ____|                         | |
@@ -171,7 +407,7 @@ def single_molecule_generator(
             print(f"Generation aborted for cycle {cycle + 1}.")
             if config.general.verbosity > 1:
                 print(e)
-        stop_event.set()
+        stop_flag.value = 1
         return None
 
     try:
@@ -198,7 +434,7 @@ def single_molecule_generator(
         return None
     finally:
         if config.refine.debug:
-            stop_event.set()
+            stop_flag.value = 1
 
     if config.general.postprocess:
         try:
@@ -216,12 +452,14 @@ def single_molecule_generator(
             return None
         finally:
             if config.postprocess.debug:
-                stop_event.set()  # Stop further runs if debugging of this step is enabled
+                stop_flag.value = (
+                    1  # Stop further runs if debugging of this step is enabled
+                )
         if config.general.verbosity > 1:
             print("Postprocessing successful.")
 
-    if not stop_event.is_set():
-        stop_event.set()  # Signal other processes to stop
+    if not stop_flag.value:
+        stop_flag.value = 1  # Signal other processes to stop
         return optimized_molecule
     elif config.refine.debug or config.postprocess.debug:
         return optimized_molecule
@@ -229,64 +467,78 @@ def single_molecule_generator(
         return None
 
 
+@lru_cache(maxsize=4)
 def header(version: str) -> str:
     """
     This function prints the header of the program.
     """
-    headerstr = (
-        # pylint: disable=C0301
-        "╔══════════════════════════════════════════════════════════════════════════════════════════════════╗\n"
-        "║                                                                                                  ║\n"
-        "║   ███╗   ███╗██╗███╗   ██╗██████╗ ██╗     ███████╗███████╗███████╗ ██████╗ ███████╗███╗   ██╗    ║\n"
-        "║   ████╗ ████║██║████╗  ██║██╔══██╗██║     ██╔════╝██╔════╝██╔════╝██╔════╝ ██╔════╝████╗  ██║    ║\n"
-        "║   ██╔████╔██║██║██╔██╗ ██║██║  ██║██║     █████╗  ███████╗███████╗██║  ███╗█████╗  ██╔██╗ ██║    ║\n"
-        "║   ██║╚██╔╝██║██║██║╚██╗██║██║  ██║██║     ██╔══╝  ╚════██║╚════██║██║   ██║██╔══╝  ██║╚██╗██║    ║\n"
-        "║   ██║ ╚═╝ ██║██║██║ ╚████║██████╔╝███████╗███████╗███████║███████║╚██████╔╝███████╗██║ ╚████║    ║\n"
-        "║   ╚═╝     ╚═╝╚═╝╚═╝  ╚═══╝╚═════╝ ╚══════╝╚══════╝╚══════╝╚══════╝ ╚═════╝ ╚══════╝╚═╝  ╚═══╝    ║\n"
-        "║                                                                                                  ║\n"
-        f"║                                       MindlessGen v{version[:5]}                                         ║\n"
-        "║                                 Semi-Automated Molecule Generator                                ║\n"
-        "║                                                                                                  ║\n"
-        "║                          Licensed under the Apache License, Version 2.0                          ║\n"
-        "║                           (http://www.apache.org/licenses/LICENSE-2.0)                           ║\n"
-        "╚══════════════════════════════════════════════════════════════════════════════════════════════════╝"
-    )
-    return headerstr
+    return _HEADER_TEMPLATE.format(version=version[:5])
 
 
 # Define a utility function to set up the required engine
 def setup_engines(
     engine_type: str,
     cfg: ConfigManager,
-    xtb_path_func: Callable,
-    orca_path_func: Callable,
+    xtb_path_func: Callable | None = None,
+    orca_path_func: Callable | None = None,
     gp3_path_func: Callable | None = None,
-):
+) -> QMMethod:
     """
     Set up the required engine.
+    Only the interface of the selected engine is imported. A function given for
+    determining the path of the binary is always used. Otherwise, an absolute
+    path to an executable in the configuration is taken as is, and the default
+    lookup is used for anything else.
     """
     if engine_type == "xtb":
+        from ..qm.xtb import XTB, get_xtb_path
+
         try:
-            path = xtb_path_func(cfg.xtb.xtb_path)
+            if xtb_path_func is None:
+                path = _get_executable_path(cfg.xtb.xtb_path) or get_xtb_path(
+                    cfg.xtb.xtb_path
+                )
+            else:
+                path = xtb_path_func(cfg.xtb.xtb_path)
             if not path:
                 raise ImportError("xtb not found.")
         except ImportError as e:
             raise ImportError("xtb not found.") from e
         return XTB(path, cfg.xtb)
     elif engine_type == "orca":
+        from ..qm.orca import ORCA, get_orca_path
+
         try:
-            path = orca_path_func(cfg.orca.orca_path)
+            if orca_path_func is None:
+                path = _get_executable_path(cfg.orca.orca_path) or get_orca_path(
+                    cfg.orca.orca_path
+                )
+            else:
+                path = orca_path_func(cfg.orca.orca_path)
             if not path:
                 raise ImportError("orca not found.")
         except ImportError as e:
             raise ImportError("orca not found.") from e
         return ORCA(path, cfg.orca)
     elif engine_type == "gp3":
+        from ..qm.gp3 import GP3, get_gp3_path
+
         if gp3_path_func is None:
-            raise ImportError("No callable function for determining the gp3 path.")
+            gp3_path_func = get_gp3_path
         path = gp3_path_func()
         if not path:
             raise ImportError("'gp3' binary could not be found.")
         return GP3(path)
     else:
         raise NotImplementedError("Engine not implemented.")
+
+
+def _get_executable_path(path: str | Path) -> Path | None:
+    """
+    Return the resolved path if it is already an absolute path to an executable,
+    so that the search in PATH can be skipped.
+    """
+    path = Path(path)
+    if path.is_absolute() and path.is_file() and os.access(path, os.X_OK):
+        return path.resolve()
+    return None
@@ -27,10 +27,6 @@ def generate_random_molecule(
     """
     Generate a random molecule of type Molecule.
     """
-    import time
-    second = time.time()
-    np.random.seed(int(second))
-
     mol = Molecule()
 
     if (config_generate.soot):
@@ -4,49 +4,41 @@ Molecule-related helper tools.
 
 import numpy as np
 
+# 0-based atomic numbers of the lanthanides and actinides
+LANTHANIDES = np.arange(56, 71)
+ACTINIDES = np.arange(88, 103)
+
 
 def set_random_charge(ati: np.ndarray, verbosity: int = 1) -> tuple[int, int]:
     """
     Set the charge of a molecule so that unpaired electrons are avoided.
     """
-    # go through all ati and add its own value + 1 to get the number of protons
-    nel = 0
-    for atom in ati:
-        nel += atom + 1
+    # sum up all ati and add 1 per atom to get the number of protons
+    nel = int(ati.sum()) + ati.size
     if verbosity > 1:
         print(f"Number of protons in molecule: {nel}")
 
-    if np.any(np.isin(ati, get_lanthanides() + get_actinides())):
+    ln_mask = np.isin(ati, LANTHANIDES)
+    ac_mask = np.isin(ati, ACTINIDES)
+    if ln_mask.any() or ac_mask.any():
         ### Special mode for lanthanides and actinides
         # -> always high spin
         # -> Divide the molecule into Ln3+/Ac3+ ions and negative "ligands"
         # -> The ligands are the remaining protons are assumed to be low spin
-        uhf = 0
-        charge = 0
-        ln_protons = 0
-        ac_protons = 0
-        for atom in ati:
-            if atom in get_lanthanides():
-                if atom < 64:
-                    uhf += atom - 56
-                else:
-                    uhf += 70 - atom
-                ln_protons += (
-                    atom - 3 + 1
-                )  # subtract 3 to get the number of protons in the Ln3+ ion
-            elif atom in get_actinides():
-                if atom < 96:
-                    uhf += atom - 88
-                else:
-                    uhf += 102 - atom
-                ac_protons += (
-                    atom - 3 + 1
-                )  # subtract 3 to get the number of protons in the Ln3+ ion
+        ln_atoms = ati[ln_mask]
+        ac_atoms = ati[ac_mask]
+        uhf = int(
+            np.where(ln_atoms < 64, ln_atoms - 56, 70 - ln_atoms).sum()
+            + np.where(ac_atoms < 96, ac_atoms - 88, 102 - ac_atoms).sum()
+        )
+        # subtract 3 to get the number of protons in the Ln3+/Ac3+ ions
+        ln_protons = int((ln_atoms - 3 + 1).sum())
+        ac_protons = int((ac_atoms - 3 + 1).sum())
         ligand_protons = nel - ln_protons - ac_protons
         if verbosity > 2:
-            if np.any(np.isin(ati, get_lanthanides())):
+            if ln_mask.any():
                 print(f"Number of protons from Ln^3+ ions: {ln_protons}")
-            if np.any(np.isin(ati, get_actinides())):
+            if ac_mask.any():
                 print(f"Number of protons from Ac^3+ ions: {ac_protons}")
             print(
                 f"Number of protons from ligands (assuming negative charge): {ligand_protons}"
@@ -126,13 +118,11 @@ def get_lanthanides() -> list[int]:
     """
     Get the atomic numbers of lanthanides.
     """
-    lanthanides = list(range(56, 71))
-    return lanthanides
+    return LANTHANIDES.tolist()
 
 
 def get_actinides() -> list[int]:
     """
     Get the atomic numbers of actinides.
     """
-    actinides = list(range(88, 103))
-    return actinides
+    return ACTINIDES.tolist()
@@ -3,7 +3,7 @@ Postprocess the generated molecules.
 """
 
 from .molecule import Molecule
-from ..qm import QMMethod
+from ..qm.base import QMMethod
 from ..prog import PostProcessConfig
 
 
@@ -10,6 +10,7 @@ from .config import (
     GenerateConfig,
     RefineConfig,
     PostProcessConfig,
+    available_cpu_count,
 )
 
 __all__ = [
@@ -20,4 +21,5 @@ __all__ = [
     "GenerateConfig",
     "RefineConfig",
     "PostProcessConfig",
+    "available_cpu_count",
 ]
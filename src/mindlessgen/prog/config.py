@@ -6,18 +6,31 @@ from __future__ import annotations
 
 from pathlib import Path
 from abc import ABC, abstractmethod
+import os
 import warnings
-import multiprocessing as mp
 import toml
 from ..molecules import PSE_NUMBERS
 
 
+def available_cpu_count() -> int:
+    """
+    Get the number of CPU cores that are available to the current process.
+    Restrictions via the CPU affinity (e.g., by taskset, cgroups, or SLURM)
+    are respected where the platform supports it.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 # abstract base class for configuration
 class BaseConfig(ABC):
     """
     Abstract base class for configuration settings.
     """
 
+    __slots__: tuple[str, ...] = ()
+
     @abstractmethod
     def __init__(self):
         pass
@@ -34,6 +47,17 @@ class GeneralConfig(BaseConfig):
     Configuration class for general settings.
     """
 
+    __slots__ = (
+        "_verbosity",
+        "_max_cycles",
+        "_print_config",
+        "_parallel",
+        "_num_molecules",
+        "_postprocess",
+        "_write_xyz",
+        "_pool_chunksize",
+    )
+
     def __init__(self: GeneralConfig) -> None:
         self._verbosity: int = 1
         self._max_cycles: int = 100
@@ -42,6 +66,7 @@ class GeneralConfig(BaseConfig):
         self._num_molecules: int = 1
         self._postprocess: bool = False
         self._write_xyz: bool = True
+        self._pool_chunksize: int = 1
 
     def get_identifier(self) -> str:
         return "general"
@@ -166,12 +191,45 @@ class GeneralConfig(BaseConfig):
             raise TypeError("Write xyz should be a boolean.")
         self._write_xyz = write_xyz
 
+    @property
+    def pool_chunksize(self):
+        """
+        Get the number of cycles that are sent to a worker process at once.
+        """
+        return self._pool_chunksize
+
+    @pool_chunksize.setter
+    def pool_chunksize(self, pool_chunksize: int):
+        """
+        Set the number of cycles that are sent to a worker process at once.
+        A value of 1 allows the fastest stop after a molecule was found,
+        larger values reduce the communication overhead for cheap cycles.
+        """
+        if not isinstance(pool_chunksize, int):
+            raise TypeError("Pool chunksize should be an integer.")
+        if pool_chunksize < 1:
+            raise ValueError("Pool chunksize should be greater than 0.")
+        self._pool_chunksize = pool_chunksize
+
 
 class GenerateConfig(BaseConfig):
     """
     Configuration for the "generate" section responsible for setting up an initial Molecule type.
     """
 
+    __slots__ = (
+        "_min_num_atoms",
+        "_max_num_atoms",
+        "_init_coord_scaling",
+        "_increase_scaling_factor",
+        "_element_composition",
+        "_forbidden_elements",
+        "_scale_fragment_detection",
+        "_scale_minimal_distance",
+        "_contract_coords",
+        "_soot",
+    )
+
     def __init__(self: GenerateConfig) -> None:
         self._min_num_atoms: int = 2
         self._max_num_atoms: int = 100
@@ -425,6 +483,8 @@ class RefineConfig(BaseConfig):
     Configuration class for refinement settings.
     """
 
+    __slots__ = ("_max_frag_cycles", "_engine", "_hlgap", "_debug")
+
     def __init__(self: RefineConfig) -> None:
         self._max_frag_cycles: int = 100
         self._engine: str = "xtb"
@@ -510,6 +570,8 @@ class PostProcessConfig(BaseConfig):
     Configuration class for post-processing settings.
     """
 
+    __slots__ = ("_engine", "_opt_cycles", "_optimize", "_debug")
+
     def __init__(self: PostProcessConfig) -> None:
         self._engine: str = "orca"
         self._opt_cycles: int | None = None
@@ -593,6 +655,8 @@ class XTBConfig(BaseConfig):
     Configuration class for XTB.
     """
 
+    __slots__ = ("_xtb_path", "_level")
+
     def __init__(self: XTBConfig) -> None:
         self._xtb_path: str | Path = "xtb"
         self._level: int = 2
@@ -638,6 +702,8 @@ class ORCAConfig(BaseConfig):
     Configuration class for ORCA.
     """
 
+    __slots__ = ("_orca_path", "_functional", "_basis", "_gridsize", "_scf_cycles")
+
     def __init__(self: ORCAConfig) -> None:
         self._orca_path: str | Path = "orca"
         self._functional: str = "PBE"
@@ -740,6 +806,8 @@ class ConfigManager:
     Overall configuration manager for the program.
     """
 
+    __slots__ = ("general", "xtb", "orca", "refine", "postprocess", "generate")
+
     def __init__(self, config_file: str | Path | None = None):
         """
         Initialize configuration sections with default values
@@ -760,11 +828,12 @@ class ConfigManager:
         """
 
         # lower number of the available cores and the configured parallelism
-        num_cores = min(mp.cpu_count(), self.general.parallel)
-        if self.general.parallel > mp.cpu_count() and verbosity > -1:
+        cpu_count = available_cpu_count()
+        num_cores = min(cpu_count, self.general.parallel)
+        if self.general.parallel > cpu_count and verbosity > -1:
             warnings.warn(
                 f"Number of cores requested ({self.general.parallel}) is greater "
-                + f"than the number of available cores ({mp.cpu_count()})."
+                + f"than the number of available cores ({cpu_count})."
                 + f"Using {num_cores} cores instead."
             )
 
@@ -897,7 +966,8 @@ class ConfigManager:
                 configstr += (
                     f"{attr_value.get_identifier().capitalize()} configuration:\n"
                 )
-                for key, value in attr_value.__dict__.items():
+                for key in attr_value.__slots__:
+                    value = getattr(attr_value, key)
                     configstr += (
                         f"{key[1:]:>30}:   {value}\n"  # Skip the leading underscore
                     )
@@ -2,10 +2,28 @@
 This module contains all QM-related functions and classes.
 """
 
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .base import QMMethod
-from .xtb import XTB, get_xtb_path
-from .orca import ORCA, get_orca_path
-from .gp3 import GP3, get_gp3_path
+
+if TYPE_CHECKING:
+    from .xtb import XTB, get_xtb_path
+    from .orca import ORCA, get_orca_path
+    from .gp3 import GP3, get_gp3_path
+
+# The engine interfaces are only imported on first access (PEP 562),
+# so that importing the package does not load all of them.
+_LAZY_ATTRIBUTES = {
+    "XTB": "xtb",
+    "get_xtb_path": "xtb",
+    "ORCA": "orca",
+    "get_orca_path": "orca",
+    "GP3": "gp3",
+    "get_gp3_path": "gp3",
+}
 
 __all__ = [
     "XTB",
@@ -16,3 +34,19 @@ __all__ = [
     "GP3",
     "get_gp3_path",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the engine interfaces lazily.
+    """
+    if name in _LAZY_ATTRIBUTES:
+        module = import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
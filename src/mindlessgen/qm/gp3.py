@@ -5,6 +5,7 @@ for next-gen tight-binding calculations.
 
 import subprocess as sp
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -160,6 +161,7 @@ class GP3(QMMethod):
 #       3. Add the renamed method to the ABC `QMMethod`
 #       4. In `main.py`: Remove the passing of the path finder functions as arguments
 #          and remove the boiler plate code to make it more general.
+@lru_cache(maxsize=4)
 def get_gp3_path(binary_name: str | Path | None = None) -> Path:
     """
     Get the path to the GP3 binary based on different possible names
@@ -4,6 +4,7 @@ This module handles all ORCA-related functionality.
 
 from pathlib import Path
 import shutil
+from functools import lru_cache
 import subprocess as sp
 from tempfile import TemporaryDirectory
 
@@ -185,6 +186,7 @@ class ORCA(QMMethod):
 #       3. Add the renamed method to the ABC `QMMethod`
 #       4. In `main.py`: Remove the passing of the path finder functions as arguments
 #          and remove the boiler plate code to make it more general.
+@lru_cache(maxsize=4)
 def get_orca_path(binary_name: str | Path | None = None) -> Path:
     """
     Get the path to the orca binary based on different possible names
@@ -5,6 +5,7 @@ This module handles all xtb-related functionality.
 import subprocess as sp
 from pathlib import Path
 import shutil
+from functools import lru_cache
 from tempfile import TemporaryDirectory
 import numpy as np
 from ..molecules import Molecule
@@ -219,6 +220,7 @@ class XTB(QMMethod):
 #       3. Add the renamed method to the ABC `QMMethod`
 #       4. In `main.py`: Remove the passing of the path finder functions as arguments
 #          and remove the boiler plate code to make it more general.
+@lru_cache(maxsize=4)
 def get_xtb_path(binary_name: str | Path | None = None) -> Path:
     """
     Get the path to the xtb binary based on different possible names
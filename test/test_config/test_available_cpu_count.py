@@ -0,0 +1,30 @@
+"""
+Test the determination of the available CPU cores.
+"""
+
+import os
+import pytest
+from mindlessgen.prog import available_cpu_count  # type: ignore
+
+
+def test_available_cpu_count_with_affinity(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The CPU affinity of the process is used if the platform supports it.
+    """
+    monkeypatch.setattr(os, "sched_getaffinity", lambda _: {0, 2, 5}, raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 64)
+    assert available_cpu_count() == 3
+
+
+def test_available_cpu_count_without_affinity(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Without CPU affinity support, the total number of CPUs is used.
+    """
+    monkeypatch.delattr(os, "sched_getaffinity", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 64)
+    assert available_cpu_count() == 64
+    # os.cpu_count() returns None if the number cannot be determined
+    monkeypatch.setattr(os, "cpu_count", lambda: None)
+    assert available_cpu_count() == 1
@@ -23,6 +23,8 @@ from mindlessgen.prog import (  # type: ignore
         ("num_molecules", 2, 0, ValueError),
         ("num_molecules", 2, "two", TypeError),
         ("postprocess", True, "yes", TypeError),
+        ("pool_chunksize", 4, 0, ValueError),
+        ("pool_chunksize", 4, "four", TypeError),
     ],
 )
 def test_general_config_property_setters(
@@ -48,6 +50,7 @@ def test_general_config_property_setters(
         ("parallel", 1),
         ("num_molecules", 1),
         ("postprocess", False),
+        ("pool_chunksize", 1),
     ],
 )
 def test_general_config_default_values(property_name, initial_value):
@@ -405,3 +405,19 @@ def test_hydrogen_addition(
         assert atom_list[0] > 0
     else:
         np.testing.assert_equal(atom_list[0], 0)
+
+
+def test_generate_random_molecule_not_reseeded(monkeypatch, default_generate_config):
+    """
+    Consecutive molecules continue the random state instead of reseeding it,
+    e.g. from the current time, which made them identical within a second.
+    """
+    seeds = []
+    monkeypatch.setattr(np.random, "seed", lambda *args: seeds.append(args))
+    default_generate_config.max_num_atoms = 10
+
+    mol1 = generate_random_molecule(default_generate_config, verbosity=0)
+    mol2 = generate_random_molecule(default_generate_config, verbosity=0)
+
+    assert seeds == []
+    assert mol1.num_atoms != mol2.num_atoms or not np.allclose(mol1.xyz, mol2.xyz)
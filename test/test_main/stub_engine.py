@@ -0,0 +1,43 @@
+"""
+QM engine stub for testing the generator without an external program.
+It is defined in an importable module, so that it can be pickled
+into the worker processes.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from mindlessgen.molecules import Molecule  # type: ignore
+from mindlessgen.qm import QMMethod  # type: ignore
+
+
+class StubEngine(QMMethod):
+    """
+    Engine that leaves the structure unchanged and fails the HOMO-LUMO gap
+    check for the first `num_failures` calls of a process (always, if None).
+    """
+
+    def __init__(self, num_failures: int | None = 0):
+        super().__init__("stub")
+        self.num_failures = num_failures
+        self.num_gap_checks = 0
+
+    def optimize(
+        self, molecule: Molecule, max_cycles: int | None = None, verbosity: int = 1
+    ) -> Molecule:
+        return molecule.copy()
+
+    def singlepoint(self, molecule: Molecule, verbosity: int = 1) -> str:
+        return ""
+
+    def check_gap(
+        self, molecule: Molecule, threshold: float, verbosity: int = 1
+    ) -> bool:
+        self.num_gap_checks += 1
+        if self.num_failures is None:
+            return False
+        return self.num_gap_checks > self.num_failures
+
+    def _run(self, temp_path: Path, arguments: list[str]) -> tuple[str, str, int]:
+        return "", "", 0
@@ -0,0 +1,61 @@
+"""
+Test the lookup of QM engine executables given as absolute paths.
+"""
+
+from pathlib import Path
+from mindlessgen.generator.main import (  # type: ignore
+    _get_executable_path,
+    setup_engines,
+)
+from mindlessgen.prog import ConfigManager  # type: ignore
+
+
+def test_get_executable_path_absolute_executable(tmp_path: Path) -> None:
+    """
+    An absolute path to an executable file is returned resolved.
+    """
+    exe = tmp_path / "xtb"
+    exe.write_text("#!/bin/sh\n")
+    exe.chmod(0o755)
+    assert _get_executable_path(exe) == exe.resolve()
+    assert _get_executable_path(str(exe)) == exe.resolve()
+
+
+def test_get_executable_path_not_executable(tmp_path: Path) -> None:
+    """
+    A file without execute permission is not accepted.
+    """
+    exe = tmp_path / "xtb"
+    exe.write_text("#!/bin/sh\n")
+    exe.chmod(0o644)
+    assert _get_executable_path(exe) is None
+    # neither is a directory or a non-existing file
+    assert _get_executable_path(tmp_path) is None
+    assert _get_executable_path(tmp_path / "orca") is None
+
+
+def test_get_executable_path_relative_name() -> None:
+    """
+    Relative names are left to the search in PATH.
+    """
+    assert _get_executable_path("xtb") is None
+    assert _get_executable_path(Path("bin") / "orca") is None
+
+
+def test_setup_engines_path_func_precedence(tmp_path: Path) -> None:
+    """
+    A given function for the path lookup is used even if the configured path
+    is an absolute path to an executable, which is taken as is otherwise.
+    """
+    exe = tmp_path / "xtb"
+    exe.write_text("#!/bin/sh\n")
+    exe.chmod(0o755)
+    other = tmp_path / "other_xtb"
+    config = ConfigManager()
+    config.xtb.xtb_path = exe
+
+    engine = setup_engines("xtb", config, xtb_path_func=lambda _: other)
+    assert engine.path == other
+
+    engine = setup_engines("xtb", config)
+    assert engine.path == exe.resolve()
@@ -1,9 +1,15 @@
+import re
+
 import pytest
 
+import mindlessgen.generator.main as main_module  # type: ignore
+import mindlessgen.prog.config as config_module  # type: ignore
 from mindlessgen.generator import generator  # type: ignore
 from mindlessgen.prog import ConfigManager  # type: ignore
 from mindlessgen.molecules import Molecule  # type: ignore
 
+from .stub_engine import StubEngine
+
 
 @pytest.mark.optional
 def test_generator():
@@ -19,3 +25,155 @@ def test_generator():
     assert exitcode == 0
     for molecule in molecules:
         assert isinstance(molecule, Molecule)
+
+
+def stub_config(parallel: int, num_molecules: int, verbosity: int) -> ConfigManager:
+    """
+    Configuration for fast runs with the stub engine.
+    """
+    config = ConfigManager()
+    config.general.parallel = parallel
+    config.general.num_molecules = num_molecules
+    config.general.verbosity = verbosity
+    config.general.max_cycles = 5
+    config.general.write_xyz = False
+    config.generate.max_num_atoms = 8
+    # all atoms form one fragment, so that only the stub engine decides
+    config.generate.scale_fragment_detection = 100.0
+    return config
+
+
+def patch_generator(
+    monkeypatch: pytest.MonkeyPatch, engine: StubEngine, cpu_count: int
+) -> None:
+    """
+    Use the stub engine and pretend that `cpu_count` cores are available.
+    """
+    monkeypatch.setattr(main_module, "setup_engines", lambda *_: engine)
+    monkeypatch.setattr(main_module, "available_cpu_count", lambda: cpu_count)
+    monkeypatch.setattr(config_module, "available_cpu_count", lambda: cpu_count)
+
+
+def reported_molecules(output: str) -> list[int]:
+    """
+    Indices of the molecules for which a header was printed.
+    """
+    return [int(i) for i in re.findall(r"Generating molecule (\d+)\s+of", output)]
+
+
+@pytest.mark.filterwarnings("ignore:Parallelization will disable verbosity")
+def test_generator_parallel_molecules(monkeypatch, capfd):
+    """
+    With at least as many molecules as cores, whole molecules are generated
+    in parallel and every molecule is reported exactly once.
+    """
+    patch_generator(monkeypatch, StubEngine(), cpu_count=2)
+    config = stub_config(parallel=2, num_molecules=4, verbosity=1)
+
+    molecules, exitcode = generator(config)
+    output = capfd.readouterr().out
+
+    assert exitcode == 0
+    assert len(molecules) == 4
+    assert "Generating 4 molecules in 2 parallel processes." in output
+    assert sorted(reported_molecules(output)) == [1, 2, 3, 4]
+
+
+def test_generator_parallel_molecules_failed(monkeypatch):
+    """
+    Failed molecules generated in parallel are reported with their own index.
+    """
+    patch_generator(monkeypatch, StubEngine(num_failures=None), cpu_count=2)
+    config = stub_config(parallel=2, num_molecules=3, verbosity=-1)
+
+    with pytest.warns(UserWarning, match="failed for all cycles") as record:
+        molecules, exitcode = generator(config)
+
+    assert exitcode == 1
+    assert molecules == []
+    failed = [
+        int(re.search(r"molecule (\d+)\.", str(w.message)).group(1))  # type: ignore
+        for w in record
+        if "failed for all cycles" in str(w.message)
+    ]
+    assert sorted(failed) == [1, 2, 3]
+
+
+@pytest.mark.filterwarnings("ignore:Parallelization will disable verbosity")
+def test_generator_parallel_cycles(monkeypatch, capfd):
+    """
+    With fewer molecules than cores, the cycles of a molecule are parallelized.
+    """
+    patch_generator(monkeypatch, StubEngine(), cpu_count=2)
+    config = stub_config(parallel=2, num_molecules=1, verbosity=1)
+
+    molecules, exitcode = generator(config)
+    output = capfd.readouterr().out
+
+    assert exitcode == 0
+    assert len(molecules) == 1
+    assert "parallel processes" not in output
+    assert reported_molecules(output) == [1]
+
+
+def test_generator_serial(monkeypatch, capfd):
+    """
+    With a single core, the molecules are generated in the main process
+    without starting a process pool.
+    """
+
+    def no_pool(*_):
+        raise AssertionError("No process pool should be started.")
+
+    patch_generator(monkeypatch, StubEngine(num_failures=2), cpu_count=1)
+    monkeypatch.setattr(main_module.mp, "get_context", no_pool)
+    config = stub_config(parallel=1, num_molecules=1, verbosity=1)
+
+    molecules, exitcode = generator(config)
+    output = capfd.readouterr().out
+
+    assert exitcode == 0
+    assert len(molecules) == 1
+    assert reported_molecules(output) == [1]
+    assert "Optimized mindless molecule found in 3 cycles." in output
+
+
+def test_generate_molecule_serial_success():
+    """
+    The number of cycles needed is returned together with the molecule.
+    """
+    config = stub_config(parallel=1, num_molecules=1, verbosity=-1)
+    molecule, cycles_needed = main_module._generate_molecule_serial(
+        config, StubEngine(num_failures=3), None
+    )
+    assert isinstance(molecule, Molecule)
+    assert cycles_needed == 4
+
+
+def test_generate_molecule_serial_stop_flag():
+    """
+    The cycles stop as soon as the stop flag is set, e.g., in debug mode.
+    """
+    config = stub_config(parallel=1, num_molecules=1, verbosity=-1)
+    config.refine.debug = True
+    engine = StubEngine(num_failures=None)
+    molecule, cycles_needed = main_module._generate_molecule_serial(
+        config, engine, None
+    )
+    assert molecule is None
+    assert cycles_needed == 1
+    assert engine.num_gap_checks == 1
+
+
+def test_generate_molecule_serial_failed():
+    """
+    If all cycles fail, no molecule and the maximum number of cycles are returned.
+    """
+    config = stub_config(parallel=1, num_molecules=1, verbosity=-1)
+    engine = StubEngine(num_failures=None)
+    molecule, cycles_needed = main_module._generate_molecule_serial(
+        config, engine, None
+    )
+    assert molecule is None
+    assert cycles_needed == config.general.max_cycles
+    assert engine.num_gap_checks == config.general.max_cycles